@@ -0,0 +1,89 @@
+import io
+import os
+import re
+import mmap
+import numpy as np
+
+# A coordinate row: x and y (exponents allowed, space or comma separated), optionally more numbers.
+# Names and labels never match, so no separate header filtering is needed.
+_NUMBER = rb'([-+]?[\d.]+(?:[eE][-+]?\d+)?)'
+_COORD_ROW = re.compile(rb'^[ \t]*' + _NUMBER + rb'[ \t,]+' + _NUMBER + rb'[-+.\deE \t\r,]*$', re.M)
+# Exactly what XFOIL reads: an x y pair separated by whitespace, nothing else on the line
+_SELIG_ROW = re.compile(rb'\s*' + _NUMBER + rb'\s+' + _NUMBER + rb'\s*')
+
+def parse_coordinates(airfoil_bytes):
+    """Coordinate rows of a dat file's contents as an (n, 2) array."""
+    # One regex pass over the whole file pulls out (x, y) pairs; numpy converts them in bulk
+    pairs = np.fromregex(io.BytesIO(airfoil_bytes), _COORD_ROW, [('x', float), ('y', float)])
+    return np.column_stack([pairs['x'], pairs['y']])
+
+def rebuild_airfoil_geometry(airfoil_bytes):
+    """Re-formats any dat file's contents to the precise TE-LE-TE format Linux XFOIL demands, or None."""
+    try:
+        coords = parse_coordinates(airfoil_bytes)
+    except ValueError:
+        return None
+    if not coords.size:
+        return None
+
+    # Write in the strict XFOIL format: 
+    # Points must be spaced clearly for the Linux Fortran compiler to read them
+    out = io.BytesIO()
+    np.savetxt(out, coords, fmt=" %10.6f %10.6f", header="REBUILT_AIRFOIL", comments="")
+    return out.getvalue()
+
+def count_points(airfoil_bytes):
+    """Number of coordinate rows in a dat file's contents."""
+    return len(_COORD_ROW.findall(airfoil_bytes))
+
+def is_xfoil_ready(airfoil_bytes):
+    """Quick check whether a dat file is plain Selig running TE -> LE -> TE, looking only at its ends."""
+    # Line 0 must be the name XFOIL's LOAD expects: without it, LOAD prompts for one and eats the
+    # next script line. The few rows after it must be bare pairs (no commas or extra columns).
+    head = airfoil_bytes[:4096].splitlines()[:6]
+    if not head or _SELIG_ROW.fullmatch(head[0]):
+        return False
+    if not all(_SELIG_ROW.fullmatch(line) for line in head[1:] if line.strip()):
+        return False
+    try:
+        # First coordinate row sits after the name line
+        start = airfoil_bytes.find(b"\n") + 1
+        first = airfoil_bytes[start:airfoil_bytes.find(b"\n", start)].split()
+        last = airfoil_bytes.rstrip().rsplit(b"\n", 1)[-1].split()
+        x_first, x_last = float(first[0]), float(last[0])
+    except (ValueError, IndexError):
+        return False
+    return 0.9 < x_first <= 1.0 and 0.9 < x_last <= 1.0
+
+def read_cp(cp_path):
+    """Loads an XFOIL CPWR dump as (x, Cp) arrays, or None if XFOIL wrote nothing."""
+    if not os.path.exists(cp_path) or not os.path.getsize(cp_path):
+        return None
+    # Parse straight from the page-cache mapping, streamed a line at a time rather than copied whole
+    with open(cp_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # '#' header lines are skipped as comments; older builds write 1 or 3 bare header lines instead.
+        # Cp is the last column (x, y, Cp in XFOIL 6.99).
+        for header_rows in (0, 1, 3):
+            mm.seek(0)
+            try:
+                data = np.loadtxt(iter(mm.readline, b""), skiprows=header_rows, usecols=(0, -1), ndmin=2)
+                break
+            except ValueError:
+                continue
+        else:
+            return None
+    if not len(data):
+        return None
+    return data[:, 0], data[:, 1]
+
+def read_polar(polar_path):
+    """Loads an XFOIL PACC polar as rows of (alpha, CL, CD, CDp, CM, Top_Xtr, Bot_Xtr), or None if missing."""
+    if not os.path.exists(polar_path):
+        return None
+    # Fixed 12-line header; XFOIL appends a row only for each converged point
+    with open(polar_path, "rb") as f:
+        rows = f.read().splitlines()[12:]
+    try:
+        return np.loadtxt(rows, ndmin=2) if rows else np.empty((0, 7))
+    except ValueError:
+        return None
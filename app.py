@@ -1,86 +1,575 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 import os
+import math
 import subprocess
+import asyncio
 import shutil
-import uuid
-import re
+import tempfile
+import hashlib
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from airfoil_io import rebuild_airfoil_geometry, is_xfoil_ready, read_cp, read_polar, count_points, parse_coordinates
 
-# Set environment for Headless Linux (Critical for Render/Streamlit)
-os.environ["DISPLAY"] = ":99"
+# Optional in-process solver (`pip install xfoil`, needs a Fortran toolchain to build).
+# Without it every solve goes through the xfoil binary below.
+try:
+    from xfoil import XFoil
+    from xfoil.model import Airfoil
+except ImportError:
+    XFoil = None
 
 st.set_page_config(page_title="Universal Airfoil Solver", layout="wide")
 
-def rebuild_airfoil_geometry(input_path, output_path):
-    """Re-formats any dat file to the precise TE-LE-TE format Linux XFOIL demands."""
-    coords = []
+# Absolute path so subprocess can use posix_spawn (it needs a path with a directory part)
+XFOIL_BIN = shutil.which("xfoil") or "xfoil"
+
+# gfortran block-buffers stdout into a pipe; unbuffered, XFOIL's Newton lines arrive as they are printed
+_XFOIL_STREAM_ENV = {**os.environ, "GFORTRAN_UNBUFFERED_PRECONNECTED": "y"}
+
+# XFOIL's scratch files live in RAM where the host has a tmpfs at /dev/shm
+_SCRATCH_ROOT = "/dev/shm" if os.access("/dev/shm", os.W_OK) else tempfile.gettempdir()
+
+# Paneled geometry depends only on the input coordinates, so it is built once per airfoil
+# (see airfoil_cache); least recently used files beyond this many are evicted
+_AIRFOIL_CACHE_FILES = 256
+
+# XFOIL keystrokes, kept as bytes so each run is one %-format and a raw pipe write.
+# Every sequence starts with PLOP -> G, which switches graphics off: XFOIL then never opens a
+# display, so it runs headless without Xvfb (Critical for Render/Streamlit).
+XFOIL_SEQUENCES = {
+    # PPAR N 160 re-distributes points (fixes NACA 0015 gaps); run once per airfoil and saved
+    "pane": b"""PLOP
+G
+
+LOAD %(airfoil)b
+PPAR
+N 160
+
+
+SAVE %(out)b
+
+QUIT
+""",
+    # THE FIX (on the already paneled airfoil): 
+    # 1. OPER -> ALFA 0 (solves easy inviscid first)
+    # 2. VISC (then turns on physics)
+    # 3. ASEQ ramps to alpha, each viscous solve starting from the previous one (see _approach)
+    # 4. PACC records which angles really converged (CPWR dumps unconverged solutions too)
+    # 0.25° steps from a converged state settle well within 80 iterations; a point that needs
+    # more is diverging, so it stays out of the polar and run_xfoil_double_pass hands the
+    # angle to the recovery run instead of returning its Cp
+    "double_pass": b"""PLOP
+G
+
+LOAD %(airfoil)b
+OPER
+ITER 80
+ALFA 0
+VISC %(re).0f
+INIT
+PACC
+%(polar)b
+
+%(approach)b
+PACC
+CPWR %(cp)b
+
+QUIT
+""",
+    # Retry for cases the quick pass cannot converge: finer panels (PPAR N 240),
+    # more iterations, and a stop at alpha/2 so the last solve starts from a warm guess
+    "recovery": b"""PLOP
+G
+
+LOAD %(airfoil)b
+PPAR
+N 240
+
+
+OPER
+ITER 500
+ALFA 0
+VISC %(re).0f
+INIT
+PACC
+%(polar)b
+
+ALFA %(half).4f
+ALFA %(alpha).4f
+PACC
+CPWR %(cp)b
+
+QUIT
+""",
+    # A block of sweep angles in one session: each ALFA starts from the previous converged solution.
+    # PACC (polar file, no dump file) records which of them converged; the second PACC closes it.
+    # The steps end in a newline already, so that PACC still arrives inside OPER.
+    "sweep": b"""PLOP
+G
+
+LOAD %(airfoil)b
+OPER
+ITER 300
+ALFA 0
+VISC %(re).0f
+INIT
+PACC
+%(polar)b
+
+%(steps)bPACC
+
+QUIT
+""",
+    # Set-up for a long-lived XFOIL: left waiting in OPER with the viscous solution at alpha 0.
+    # Its one PACC polar stays open for the whole session (XFOIL has only a few polar slots).
+    "warm": b"""PLOP
+G
+
+LOAD %(airfoil)b
+OPER
+ITER 300
+ALFA 0
+VISC %(re).0f
+INIT
+PACC
+%(polar)b
+
+""",
+}
+_SWEEP_STEP = b"ALFA %.4f\nCPWR %b\n"
+# One angle on the long-lived XFOIL, ramped from the last angle it solved (see _approach).
+# The second CPWR only starts once the first file is closed, so its file appearing marks the result ready.
+_WARM_STEP = b"""%(approach)b
+CPWR %(cp)b
+CPWR %(done)b
+"""
+
+@st.cache_resource
+def cleanup_pool():
+    """Background workers that delete scratch folders so no rerun waits on unlinking files."""
+    return ThreadPoolExecutor(max_workers=2)
+
+@st.cache_resource
+def airfoil_cache():
+    """This server's paneled-geometry folder, private to it (mkdtemp creates it 0700)."""
+    # Same filesystem as the scratch dirs, so paneled results can be os.replace'd straight in
+    return tempfile.mkdtemp(prefix="airfoil_cache_", dir=_SCRATCH_ROOT)
+
+def trim_airfoil_cache(cache_dir):
+    """Evicts the least recently used geometry so the cache cannot fill the tmpfs."""
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(".dat"):
+            try:
+                entries.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                pass  # Evicted by a concurrent trim
+    for _, path in sorted(entries)[:-_AIRFOIL_CACHE_FILES]:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+def scratch_dir():
+    """A fresh working folder for one XFOIL run; callers hand it to discard_dir in a finally."""
+    return tempfile.mkdtemp(prefix="xfoil_", dir=_SCRATCH_ROOT)
+
+def discard_dir(path):
+    cleanup_pool().submit(shutil.rmtree, path, ignore_errors=True)
+
+def run_xfoil_script(commands, timeout, progress=None):
+    """Feeds one command script to a fresh XFOIL; returns False if it ran past the timeout."""
+    if progress is not None:
+        return asyncio.run(_stream_xfoil_script(commands, timeout, progress))
+    # XFOIL's console chatter is never read, so it goes to /dev/null instead of a pipe.
+    # No cwd/preexec_fn and close_fds=False let CPython launch via posix_spawn instead of fork+exec,
+    # so start-up cost does not grow with the Streamlit process size. Python's own fds are
+    # non-inheritable by default, so nothing leaks into the child.
+    try:
+        subprocess.run(
+            [XFOIL_BIN], input=commands,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, close_fds=False, timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        # run() has already killed and reaped the diverging solve
+        return False
+    return True
+
+async def _stream_xfoil_script(commands, timeout, progress):
+    """run_xfoil_script that reads XFOIL's console and passes each Newton "rms" line to `progress`."""
+    proc = await asyncio.create_subprocess_exec(
+        XFOIL_BIN,
+        stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL, close_fds=False, env=_XFOIL_STREAM_ENV
+    )
+
+    async def follow():
+        proc.stdin.write(commands)
+        await proc.stdin.drain()
+        proc.stdin.close()
+        async for line in proc.stdout:
+            if b"rms" in line:
+                progress(line.decode("latin-1").strip())
+        await proc.wait()
+
     try:
-        with open(input_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line or any(c.isalpha() for c in line): continue
-                p = re.split(r'\s+|,', line)
-                p = [x for x in p if x]
-                if len(p) >= 2:
-                    coords.append((float(p[0]), float(p[1])))
-        
-        if not coords: return False
-
-        # Write in the strict XFOIL format: 
-        # Points must be spaced clearly for the Linux Fortran compiler to read them
-        with open(output_path, "w") as f:
-            f.write("REBUILT_AIRFOIL\n")
-            for x, y in coords:
-                f.write(f" {x:10.6f} {y:10.6f}\n")
-        return True
-    except:
+        await asyncio.wait_for(follow(), timeout)
+    except asyncio.TimeoutError:
         return False
+    finally:
+        # Also covers Streamlit stopping the script from inside `progress`: the solve dies with it
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+    return True
 
-def run_xfoil_double_pass(airfoil_path, reynolds, alpha, work_dir):
+def prepare_airfoil(airfoil_bytes):
+    """Panels the airfoil once (if needed) and returns the cached file, or None if XFOIL failed."""
+    digest = hashlib.blake2b(airfoil_bytes, digest_size=16).hexdigest()
+
+    # The cache sits on a small tmpfs, so every write here may hit ENOSPC
+    work_dir = None
+    try:
+        cache_dir = airfoil_cache()
+        paneled = os.path.join(cache_dir, f"{digest}.dat")
+        if os.path.exists(paneled):
+            # Refresh its mtime, so trimming evicts other airfoils first
+            os.utime(paneled)
+            return paneled
+
+        if 140 <= count_points(airfoil_bytes) <= 200:
+            # Already near XFOIL's 160-panel default; repaneling would only refit the same spline
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(airfoil_bytes)
+                os.replace(tmp_path, paneled)
+            except OSError:
+                os.unlink(tmp_path)
+                raise
+        else:
+            work_dir = scratch_dir()
+            airfoil_path = os.path.join(work_dir, "fixed.dat")
+            out_path = os.path.join(work_dir, "paneled.dat")
+            with open(airfoil_path, "wb") as f:
+                f.write(airfoil_bytes)
+            commands = XFOIL_SEQUENCES["pane"] % {
+                b"airfoil": os.fsencode(airfoil_path), b"out": os.fsencode(out_path),
+            }
+            if not (run_xfoil_script(commands, timeout=30) and os.path.exists(out_path)):
+                return None
+            # Atomic move, so a concurrent reader never sees a half-written file
+            os.replace(out_path, paneled)
+        trim_airfoil_cache(cache_dir)
+    except OSError:
+        return None
+    finally:
+        if work_dir:
+            discard_dir(work_dir)
+    return paneled
+
+def _approach(alpha, start=0.0):
+    """OPER command that reaches `alpha` from a solution at `start`: a 0.25° ASEQ ramp, or one ALFA when close."""
+    if abs(alpha - start) < 0.5:
+        return b"ALFA %.4f" % alpha
+    # ASEQ stops on the last whole step, so a closing ALFA lands exactly on the requested angle
+    return b"ASEQ %.4f %.4f %.2f\nALFA %.4f" % (start, alpha, math.copysign(0.25, alpha - start), alpha)
+
+def converged(polar, alphas):
+    """Which of `alphas` have a row in a PACC polar (XFOIL only adds converged points)."""
+    if polar is None:
+        return np.zeros(len(alphas), dtype=bool)
+    # The polar prints alpha to 3 decimals
+    return np.isclose(np.asarray(alphas)[:, None], polar[:, 0], atol=1e-3).any(axis=1)
+
+def run_xfoil_double_pass(airfoil_path, reynolds, alpha, work_dir, mode="double_pass", progress=None):
     cp_path = os.path.join(work_dir, "cp.txt")
+    polar_path = os.path.join(work_dir, f"polar_{mode}.txt")
     
-    # THE FIX: 
-    # 1. PANE re-distributes points (fixes NACA 0015 gaps)
-    # 2. OPER -> ALFA 0 (solves easy inviscid first)
-    # 3. VISC (then turns on physics)
-    commands = f"""
-    LOAD {airfoil_path}
-    PANE
-    OPER
-    ITER 500
-    ALFA 0
-    VISC {reynolds}
-    INIT
-    ALFA {alpha}
-    CPWR {cp_path}
-    
-    QUIT
-    """
+    commands = XFOIL_SEQUENCES[mode] % {
+        b"airfoil": os.fsencode(airfoil_path), b"re": reynolds,
+        b"alpha": alpha, b"half": alpha / 2, b"approach": _approach(alpha),
+        b"polar": os.fsencode(polar_path), b"cp": os.fsencode(cp_path),
+    }
     
     try:
-        process = subprocess.Popen(
-            ["xvfb-run", "-a", "xfoil"],
-            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+        if not run_xfoil_script(commands, timeout=30 if mode == "recovery" else 10, progress=progress):
+            return None
+    except OSError:
+        # XFOIL missing or dead before it read its script (broken pipe)
+        return None
+
+    if not converged(read_polar(polar_path), [alpha])[0]:
+        return None
+    return read_cp(cp_path)
+
+def _quit_xfoil(stdin):
+    try:
+        stdin.write(b"\n\nQUIT\n")
+        stdin.close()
+    except (OSError, ValueError):
+        pass  # XFOIL already gone, or its stdin already closed
+
+def close_xfoil_session():
+    proc = st.session_state.pop("xfoil_proc", None)
+    st.session_state.pop("xfoil_key", None)
+    st.session_state.pop("xfoil_alpha", None)
+    st.session_state.pop("xfoil_rows", None)
+    session_dir = st.session_state.pop("xfoil_dir", None)
+    if proc is not None and proc.poll() is None:
+        _quit_xfoil(proc.stdin)
+        try:
+            proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    if session_dir:
+        discard_dir(session_dir)
+
+def xfoil_session(airfoil_path, reynolds):
+    """This browser session's long-lived XFOIL, already loaded and viscous at `reynolds`."""
+    key = (airfoil_path, reynolds)
+    proc = st.session_state.get("xfoil_proc")
+    if proc is not None and proc.poll() is None and st.session_state.get("xfoil_key") == key:
+        return proc
+
+    close_xfoil_session()
+    session_dir = scratch_dir()
+    try:
+        proc = subprocess.Popen(
+            [XFOIL_BIN],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            close_fds=False, env=_XFOIL_STREAM_ENV
         )
-        process.communicate(input=commands, timeout=30)
-    except:
+    except OSError:
+        discard_dir(session_dir)
+        raise
+    # Read between polls in run_xfoil_warm, so it must never block
+    os.set_blocking(proc.stdout.fileno(), False)
+    # Registered first so it runs last: remove the session's polar once the QUIT below is sent
+    weakref.finalize(proc, shutil.rmtree, session_dir, True)
+    # QUIT it once the browser session is gone (its state is garbage-collected) or the server exits
+    weakref.finalize(proc, _quit_xfoil, proc.stdin)
+    st.session_state["xfoil_proc"] = proc
+    st.session_state["xfoil_key"] = key
+    st.session_state["xfoil_dir"] = session_dir
+    # Angle of the last converged solution, which the next step ramps from
+    st.session_state["xfoil_alpha"] = 0.0
+    # Polar rows already accounted for; each step's own rows come after these
+    st.session_state["xfoil_rows"] = 0
+    proc.stdin.write(XFOIL_SEQUENCES["warm"] % {
+        b"airfoil": os.fsencode(airfoil_path), b"re": reynolds,
+        b"polar": os.fsencode(os.path.join(session_dir, "polar.txt")),
+    })
+    proc.stdin.flush()
+    return proc
+
+def _relay_progress(stdout, tail, progress):
+    """Drains what XFOIL has printed so far, passing the latest "rms" line to `progress`; returns the unfinished line."""
+    chunks = [tail]
+    while True:
+        try:
+            chunk = os.read(stdout.fileno(), 65536)
+        except BlockingIOError:
+            break
+        if not chunk:
+            break
+        chunks.append(chunk)
+    lines = b"".join(chunks).split(b"\n")
+    if progress is not None:
+        # Only the newest iteration matters for the label; older ones in this chunk are stale already
+        latest = next((line for line in reversed(lines[:-1]) if b"rms" in line), None)
+        if latest is not None:
+            progress(latest.decode("latin-1").strip())
+    return lines[-1]
+
+def run_xfoil_warm(airfoil_path, reynolds, alpha, work_dir, timeout=10, progress=None):
+    """Solves one angle on the session's running XFOIL, skipping process start, LOAD and set-up."""
+    cp_path = os.path.join(work_dir, "cp.txt")
+    done_path = os.path.join(work_dir, "done.txt")
+    try:
+        proc = xfoil_session(airfoil_path, reynolds)
+        proc.stdin.write(_WARM_STEP % {
+            b"approach": _approach(alpha, st.session_state["xfoil_alpha"]),
+            b"cp": os.fsencode(cp_path), b"done": os.fsencode(done_path),
+        })
+        proc.stdin.flush()
+    except OSError:
+        close_xfoil_session()
         return None
 
-    # Parse CP results
-    cp_x, cp_y = [], []
-    if os.path.exists(cp_path):
-        with open(cp_path, "r") as f:
-            lines = f.readlines()
-            # XFOIL CP files have headers; skip them
-            for line in lines:
-                parts = line.split()
-                if len(parts) == 3 and not parts[0].isalpha():
-                    try:
-                        cp_x.append(float(parts[0]))
-                        cp_y.append(float(parts[1]))
-                    except: continue
-    return cp_x, cp_y
+    deadline = time.monotonic() + timeout
+    tail = b""
+    try:
+        while not os.path.exists(done_path):
+            if proc.poll() is not None or time.monotonic() > deadline:
+                # Diverged or died: start clean next time
+                close_xfoil_session()
+                return None
+            # Draining also keeps a full pipe from stalling XFOIL mid-solve
+            tail = _relay_progress(proc.stdout, tail, progress)
+            time.sleep(0.01)
+        _relay_progress(proc.stdout, tail, progress)
+    except BaseException:
+        # Streamlit stopping the script from inside `progress` would leave XFOIL mid-step,
+        # writing into a work_dir that is about to be deleted: never keep such a session
+        close_xfoil_session()
+        raise
+
+    # Only the rows this step appended (ramp points included) say whether it reached alpha
+    polar = read_polar(os.path.join(st.session_state["xfoil_dir"], "polar.txt"))
+    if polar is None or not converged(polar[st.session_state["xfoil_rows"]:], [alpha])[0]:
+        # A diverged solve leaves its boundary layers behind to seed the next angle: start clean
+        close_xfoil_session()
+        return None
+    st.session_state["xfoil_rows"] = len(polar)
+    st.session_state["xfoil_alpha"] = alpha
+    return read_cp(cp_path)
+
+def solve_with_fallback(airfoil_path, reynolds, alpha, work_dir, warm=False, progress=None):
+    """Quick solve first; only if it fails, pay for the slower finer-panel recovery run."""
+    if warm:
+        res = run_xfoil_warm(airfoil_path, reynolds, alpha, work_dir, progress=progress)
+    else:
+        res = run_xfoil_double_pass(airfoil_path, reynolds, alpha, work_dir, progress=progress)
+    if res is None:
+        res = run_xfoil_double_pass(airfoil_path, reynolds, alpha, work_dir, mode="recovery", progress=progress)
+    return res
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def clean_airfoil(raw_bytes):
+    """XFOIL-ready contents for an uploaded dat file, or None if it cannot be parsed; cached per upload."""
+    # Well-formed files (e.g. UIUC Selig) go to XFOIL as uploaded; only the rest get rebuilt
+    if is_xfoil_ready(raw_bytes):
+        return raw_bytes
+    return rebuild_airfoil_geometry(raw_bytes)
+
+def solve_in_process(airfoil_bytes, reynolds, alphas):
+    """Solves with the linked XFOIL library (no process, files or display); one (x, Cp) or None per angle."""
+    coords = parse_coordinates(airfoil_bytes)
+    # Each XFoil() loads its own copy of the library, so concurrent callers do not share solver state
+    xf = XFoil()
+    xf.print = False
+    xf.airfoil = Airfoil(x=coords[:, 0], y=coords[:, 1])
+    xf.repanel()
+    xf.Re = reynolds
+    xf.max_iter = 500
+    # Same double pass as the script: settle alpha 0 first, then walk the angles in order
+    xf.a(0.0)
+    results = []
+    for alpha in alphas:
+        cl, _, _, _ = xf.a(alpha)
+        results.append(None if np.isnan(cl) else xf.get_cp_distribution())
+    return results
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def solve_cp(airfoil_bytes, reynolds, alpha, _warm=False, _progress=None):
+    """Cached XFOIL run keyed on the cleaned airfoil file plus (Re, alpha)."""
+    # `_warm` uses the session's live XFOIL and `_progress` receives XFOIL's convergence lines.
+    # Both are script-thread only; the underscores keep them out of the cache key.
+    res = None
+    if XFoil is not None:
+        res = solve_in_process(airfoil_bytes, reynolds, [alpha])[0]
+    # The binary's finer-panel recovery run still backs up the library when it is installed
+    airfoil_path = prepare_airfoil(airfoil_bytes) if res is None else None
+    if airfoil_path:
+        work_dir = scratch_dir()
+        try:
+            res = solve_with_fallback(airfoil_path, reynolds, alpha, work_dir, warm=_warm, progress=_progress)
+        finally:
+            discard_dir(work_dir)
+    if res is None:
+        # Raising keeps failures out of the cache, so a retry really re-runs XFOIL
+        raise RuntimeError(f"XFOIL did not converge at {alpha}°")
+    return res
+
+def run_xfoil_sweep(airfoil_path, reynolds, alphas, work_dir):
+    """Solves a run of angles in one warm-started XFOIL session; one (x, Cp) or None per angle."""
+    cp_paths = [os.path.join(work_dir, f"cp_{i}.txt") for i in range(len(alphas))]
+    polar_path = os.path.join(work_dir, "polar.txt")
+    steps = b"".join(_SWEEP_STEP % (alpha, os.fsencode(path)) for alpha, path in zip(alphas, cp_paths))
+    commands = XFOIL_SEQUENCES["sweep"] % {
+        b"airfoil": os.fsencode(airfoil_path), b"re": reynolds,
+        b"polar": os.fsencode(polar_path), b"steps": steps,
+    }
+    
+    try:
+        finished = run_xfoil_script(commands, timeout=10 * len(alphas))
+    except OSError:
+        return [None] * len(alphas)
+
+    # Angles finished before a timeout still left their cp files behind
+    results = [read_cp(path) for path in cp_paths]
+    # A killed XFOIL may not have flushed its polar, so it is only trusted after a clean exit
+    polar = read_polar(polar_path) if finished else None
+    if polar is not None:
+        # CPWR writes unconverged solutions too; only angles in the polar actually converged
+        results = [res if ok else None for res, ok in zip(results, converged(polar, alphas))]
+    return results
+
+class SweepIncomplete(RuntimeError):
+    """A sweep with failed angles; `results` holds what did converge (None elsewhere)."""
+    def __init__(self, results):
+        super().__init__(f"XFOIL did not converge at {sum(res is None for res in results)} of {len(results)} angles")
+        self.results = results
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def run_alpha_sweep(airfoil_bytes, reynolds, alphas):
+    """Solves a sweep as one contiguous block of angles per core, each block in a single session."""
+    # Like solve_cp, any failure raises (SweepIncomplete) so a rerun tries again instead of replaying it
+    if not alphas:
+        return []
+    airfoil_path = prepare_airfoil(airfoil_bytes) if XFoil is None else None
+    if XFoil is None and not airfoil_path:
+        raise SweepIncomplete([None] * len(alphas))
+
+    def solve_block(block):
+        if XFoil is not None:
+            return solve_in_process(airfoil_bytes, reynolds, block)
+        work_dir = scratch_dir()
+        try:
+            return run_xfoil_sweep(airfoil_path, reynolds, block, work_dir)
+        finally:
+            discard_dir(work_dir)
+
+    def retry(alpha):
+        # Angles the warm session could not converge get the quick + recovery treatment
+        try:
+            return solve_cp(airfoil_bytes, reynolds, alpha)
+        except RuntimeError:
+            return None
+
+    n_blocks = min(os.cpu_count() or 1, len(alphas))
+    blocks = [[float(a) for a in block] for block in np.array_split(alphas, n_blocks)]
+    # Threads are enough here: the solving happens inside the xfoil child processes
+    with ThreadPoolExecutor(max_workers=n_blocks) as pool:
+        results = [res for block in pool.map(solve_block, blocks) for res in block]
+        failed = [i for i, res in enumerate(results) if res is None]
+        for i, res in zip(failed, pool.map(retry, [alphas[i] for i in failed])):
+            results[i] = res
+    if any(res is None for res in results):
+        raise SweepIncomplete(results)
+    return results
+
+def throttled(update, interval=0.1):
+    """Wraps a progress callback so it passes on a changed label at most every `interval` seconds."""
+    last_label, last_at = None, 0.0
+
+    def relay(label):
+        nonlocal last_label, last_at
+        now = time.monotonic()
+        if label != last_label and now - last_at >= interval:
+            last_label, last_at = label, now
+            update(label)
+    return relay
+
+def cp_trace(x, y, name, max_points=512):
+    """WebGL line trace of a Cp curve, thinned by stride to at most `max_points` points."""
+    stride = max(1, -(-len(x) // max_points))
+    return go.Scattergl(x=x[::stride], y=y[::stride], mode='lines', name=name)
 
 # --- UI ---
 st.title("✈️ Bulletproof Airfoil CFD")
@@ -89,33 +578,64 @@ st.markdown("This version uses **Double-Pass Solving** to prevent Linux converge
 uploaded_file = st.file_uploader("Upload Airfoil .dat", type=['dat'])
 
 if uploaded_file:
-    work_dir = os.path.join("/tmp", str(uuid.uuid4()))
-    os.makedirs(work_dir, exist_ok=True)
-    
-    raw = os.path.join(work_dir, "raw.dat")
-    fixed = os.path.join(work_dir, "fixed.dat")
-    
-    with open(raw, "wb") as f:
-        f.write(uploaded_file.getbuffer())
-
     # Sidebar parameters
     re_val = st.sidebar.number_input("Reynolds Number", value=1000000)
-    aoa = st.sidebar.slider("Angle of Attack", -5.0, 12.0, 0.0)
+    mode = st.sidebar.radio("Analysis Mode", ["Single Angle", "Alpha Sweep"])
+    if mode == "Single Angle":
+        aoa = st.sidebar.slider("Angle of Attack", -5.0, 12.0, 0.0)
+    else:
+        a_start, a_end = st.sidebar.slider("Alpha Range", -5.0, 12.0, (-4.0, 8.0))
+        a_step = st.sidebar.number_input("Alpha Step", 0.25, 5.0, 2.0)
 
     if st.button("🚀 Run Simulation"):
-        if rebuild_airfoil_geometry(raw, fixed):
-            with st.spinner("Stabilizing math and solving..."):
-                res_x, res_y = run_xfoil_double_pass(fixed, re_val, aoa, work_dir)
-                
-                if res_x:
+        fixed_bytes = clean_airfoil(uploaded_file.getvalue())
+        if fixed_bytes is not None:
+            if mode == "Single Angle":
+                with st.status("Stabilizing math and solving...") as status:
+                    try:
+                        res_x, res_y = solve_cp(
+                            fixed_bytes, re_val, aoa, _warm=True,
+                            # Each update is a websocket delta; XFOIL prints far faster than anyone reads
+                            _progress=throttled(lambda line: status.update(label=f"Converging: {line}"))
+                        )
+                    except RuntimeError:
+                        res_x = None
+                    if res_x is not None:
+                        status.update(label=f"Solved at {aoa}°", state="complete")
+                    else:
+                        status.update(label="No converged solution", state="error")
+
+                if res_x is not None:
                     st.success(f"Converged at {aoa}°!")
-                    fig = go.Figure(data=go.Scatter(x=res_x, y=res_y, mode='lines', name="Pressure Coefficient"))
-                    fig.update_layout(xaxis_title="x/c", yaxis_title="-Cp")
+                    fig = go.Figure(data=cp_trace(res_x, res_y, "Pressure Coefficient"))
+                    # Fixed uirevision keeps zoom/pan when a new angle redraws the chart
+                    fig.update_layout(xaxis_title="x/c", yaxis_title="-Cp", uirevision='cp')
                     fig.update_yaxes(autorange="reversed")
                     st.plotly_chart(fig, use_container_width=True)
                 else:
-                    st.error("Convergence failed. Linux XFOIL requires a smaller Angle of Attack step.")
+                    st.error("Convergence failed, even after retrying on finer panels. Try a smaller Angle of Attack.")
+            else:
+                alphas = tuple(float(a) for a in np.round(np.arange(a_start, a_end + a_step / 2, a_step), 2))
+                with st.spinner(f"Solving {len(alphas)} angles in warm-started parallel blocks..."):
+                    try:
+                        results = run_alpha_sweep(fixed_bytes, re_val, alphas)
+                    except SweepIncomplete as e:
+                        results = e.results
+                
+                fig = go.Figure()
+                failed = []
+                for alpha, res in zip(alphas, results):
+                    if res is not None:
+                        fig.add_trace(cp_trace(res[0], res[1], f"α = {alpha}°"))
+                    else:
+                        failed.append(alpha)
+                
+                if len(failed) < len(alphas):
+                    st.success(f"Converged at {len(alphas) - len(failed)} of {len(alphas)} angles.")
+                    fig.update_layout(xaxis_title="x/c", yaxis_title="-Cp", uirevision='cp')
+                    fig.update_yaxes(autorange="reversed")
+                    st.plotly_chart(fig, use_container_width=True)
+                if failed:
+                    st.error(f"Convergence failed at: {', '.join(f'{a}°' for a in failed)}")
         else:
             st.error("Format error in .dat file.")
-    
-    shutil.rmtree(work_dir, ignore_errors=True)